@@ -114,6 +114,10 @@ class BashApp(AppBase):
         # doesn't support
         remote_fn = partial(update_wrapper(remote_side_bash_executor, self.func), self.func)
         remote_fn.__name__ = self.func.__name__
+        # inspect.getsource cannot see through a partial, so point at the app
+        # function explicitly: this lets the memoizer identify a bash app by
+        # the source of the app function, rather than only by its name.
+        remote_fn.__wrapped__ = self.func
         self.wrapped_remote_function = wrap_error(remote_fn)
 
     def __call__(self, *args, **kwargs):
@@ -202,6 +202,8 @@ class DataFlowKernel(object):
                            'id', 'time_invoked', 'try_time_launched', 'time_returned', 'try_time_returned', 'executor']
 
         task_log_info = {"task_" + k: task_record[k] for k in info_to_monitor}
+        if task_record['hashsum'] is not None:
+            task_log_info['task_hashsum'] = task_record['hashsum'].hex()
         task_log_info['run_id'] = self.run_id
         task_log_info['try_id'] = task_record['try_id']
         task_log_info['timestamp'] = datetime.datetime.now()
@@ -1,9 +1,11 @@
 import hashlib
-from functools import lru_cache, singledispatch
+from functools import singledispatch
 from inspect import getsource
 import logging
-from parsl.serialize import serialize
+import pickle
+import struct
 import types
+import weakref
 from concurrent.futures import Future
 
 logger = logging.getLogger(__name__)
@@ -42,12 +44,109 @@ def id_for_memo(obj, output_ref=False):
     raise ValueError("unknown type for memoization: {}".format(type(obj)))
 
 
+_id_for_memo_registry = id_for_memo.registry
+
+
+def _id_for_memo_fast(obj, output_ref=False):
+    """Behaves the same as id_for_memo, but is cheaper to call for values
+    whose exact type has a registered implementation.
+
+    This is used inside the memoizer, where id_for_memo is invoked for
+    every argument of every task and for every element of list, tuple and
+    dict arguments. Rather than going through the full singledispatch
+    machinery, the exact type of the value is looked up in the dispatch
+    registry. Because the live registry is used, implementations
+    registered later by users are picked up straight away. Subclasses and
+    unknown types fall back to the normal dispatch.
+
+    The result is checked to be bytes, as required of id_for_memo
+    implementations.
+    """
+    handler = _id_for_memo_registry.get(type(obj))
+    if handler is None:
+        handler = id_for_memo.dispatch(type(obj))
+    memo_id = handler(obj, output_ref=output_ref)
+
+    # Memo ids are fed straight into hash objects, which would otherwise
+    # fail with an error that does not say which implementation is at fault.
+    if not isinstance(memo_id, (bytes, bytearray)):
+        raise ValueError("id_for_memo implementation {} for type {} returned {}, not bytes".format(
+                         handler, type(obj), type(memo_id)))
+    return memo_id
+
+
+# id_for_memo_serialize is only used for subclasses of the str, int and float
+# types encoded below. Their memo id only needs to be a stable byte identity,
+# not something which can be shipped to and decoded by another process, so
+# plain pickle is used rather than the parsl serialization facade. The
+# protocol is pinned so that these ids (and so checkpoints) do not depend on
+# the Python version.
+MEMO_PICKLE_PROTOCOL = 4
+
+
+def id_for_memo_serialize(obj, output_ref=False):
+    return pickle.dumps(obj, protocol=MEMO_PICKLE_PROTOCOL)
+
+
+# The scalar types below are encoded directly, rather than by pickling. Each
+# encoding starts with a one byte type tag so that values of different types
+# cannot produce the same bytes (none of the tags collide with the pickle
+# protocol header either). Subclasses of these types are pickled, so that
+# for example an IntEnum member is not treated as the same as a plain int.
+
 @id_for_memo.register(str)
+def id_for_memo_str(obj, output_ref=False):
+    if type(obj) is not str:
+        return id_for_memo_serialize(obj)
+    return b's' + obj.encode('utf-8', 'surrogatepass')
+
+
 @id_for_memo.register(int)
+def id_for_memo_int(obj, output_ref=False):
+    if type(obj) is not int:
+        return id_for_memo_serialize(obj)
+    return b'i' + obj.to_bytes((obj.bit_length() + 8) // 8, 'little', signed=True)
+
+
+@id_for_memo.register(bool)
+def id_for_memo_bool(obj, output_ref=False):
+    return b'b\x01' if obj else b'b\x00'
+
+
 @id_for_memo.register(float)
+def id_for_memo_float(obj, output_ref=False):
+    if type(obj) is not float:
+        return id_for_memo_serialize(obj)
+    return b'f' + struct.pack('<d', obj)
+
+
 @id_for_memo.register(type(None))
-def id_for_memo_serialize(obj, output_ref=False):
-    return serialize(obj)
+def id_for_memo_none(obj, output_ref=False):
+    return b'n'
+
+
+def _update_with_memo_id(h, memo_id):
+    """Feed a component memo id into the hash h, prefixed by its length so
+    that the boundaries between consecutive components are unambiguous.
+    """
+    h.update(len(memo_id).to_bytes(8, 'little'))
+    h.update(memo_id)
+
+
+# Lists, tuples and dicts are hashed by streaming the ids of their elements
+# into a single hash object, rather than by building an intermediate list of
+# element ids and pickling that. Lists and tuples share the b'L' tag, so a
+# list and a tuple with the same elements have the same memo id.
+
+def _id_for_memo_sequence(seq, output_ref):
+    h = hashlib.blake2b(digest_size=32)
+    h.update(b'L')
+    h.update(len(seq).to_bytes(8, 'little'))
+
+    for e in seq:
+        _update_with_memo_id(h, _id_for_memo_fast(e, output_ref=output_ref))
+
+    return h.digest()
 
 
 @id_for_memo.register(list)
@@ -55,12 +154,7 @@ def id_for_memo_list(denormalized_list, output_ref=False):
     if type(denormalized_list) != list:
         raise ValueError("id_for_memo_list cannot work on subclasses of list")
 
-    normalized_list = []
-
-    for e in denormalized_list:
-        normalized_list.append(id_for_memo(e, output_ref=output_ref))
-
-    return serialize(normalized_list)
+    return _id_for_memo_sequence(denormalized_list, output_ref)
 
 
 @id_for_memo.register(tuple)
@@ -68,12 +162,7 @@ def id_for_memo_tuple(denormalized_tuple, output_ref=False):
     if type(denormalized_tuple) != tuple:
         raise ValueError("id_for_memo_tuple cannot work on subclasses of tuple")
 
-    normalized_list = []
-
-    for e in denormalized_tuple:
-        normalized_list.append(id_for_memo(e, output_ref=output_ref))
-
-    return serialize(normalized_list)
+    return _id_for_memo_sequence(denormalized_tuple, output_ref)
 
 
 @id_for_memo.register(dict)
@@ -86,19 +175,60 @@ def id_for_memo_dict(denormalized_dict, output_ref=False):
     if type(denormalized_dict) != dict:
         raise ValueError("id_for_memo_dict cannot work on subclasses of dict")
 
-    keys = sorted(denormalized_dict)
+    # Entries are put in a canonical order by sorting on the memo ids of the
+    # keys, rather than on the keys themselves: comparing bytes is cheap, and
+    # works for dicts whose keys are of types which cannot be compared with
+    # each other, such as {1: 'a', 'b': 2}.
+    items = [(_id_for_memo_fast(k), _id_for_memo_fast(v, output_ref=output_ref))
+             for k, v in denormalized_dict.items()]
+    items.sort()
+
+    h = hashlib.blake2b(digest_size=32)
+    h.update(b'D')
+    h.update(len(items).to_bytes(8, 'little'))
+
+    for key_id, value_id in items:
+        _update_with_memo_id(h, key_id)
+        _update_with_memo_id(h, value_id)
+
+    return h.digest()
+
 
-    normalized_list = []
-    for k in keys:
-        normalized_list.append(id_for_memo(k))
-        normalized_list.append(id_for_memo(denormalized_dict[k], output_ref=output_ref))
-    return serialize(normalized_list)
+# Function memo ids are expensive to compute, as they read source code from
+# disk, and the same few app functions are seen over and over again. They are
+# cached for as long as each function object is alive: unlike an LRU cache of
+# fixed size, this neither thrashes when a workflow has many apps nor keeps
+# dead functions alive.
+_function_memo_ids = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[types.FunctionType, bytes]
+
+
+def _code_digest(code):
+    """Digest the parts of a code object which determine its behaviour.
+
+    This is the fallback for functions whose source code is not available,
+    for example because they were created with exec. Names and constants
+    are included along with the bytecode, as the bytecode only refers to
+    them by index, and nested code objects (such as inner functions and
+    comprehensions) are digested recursively. Line numbers and file names
+    are left out, so as with source based ids, moving a function around
+    does not change its id. Bytecode differs between Python versions, so
+    unlike source based ids, these ids are not stable across an upgrade.
+    """
+    h = hashlib.blake2b(digest_size=32)
+    _update_with_memo_id(h, code.co_code)
+    _update_with_memo_id(h, repr((code.co_names, code.co_varnames, code.co_freevars)).encode('utf-8'))
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _update_with_memo_id(h, _code_digest(const))
+        elif isinstance(const, frozenset):
+            # the iteration order of a frozenset of strings differs between runs
+            _update_with_memo_id(h, repr(sorted(const, key=repr)).encode('utf-8'))
+        else:
+            _update_with_memo_id(h, repr(const).encode('utf-8'))
+    return h.digest()
 
 
-# the LRU cache decorator must be applied closer to the id_for_memo_function call
-# that the .register() call, so that the cache-decorated version is registered.
 @id_for_memo.register(types.FunctionType)
-@lru_cache()
 def id_for_memo_function(function, output_ref=False):
     """This produces function hash material using the source definition of the
        function.
@@ -107,14 +237,32 @@ def id_for_memo_function(function, output_ref=False):
        too sensitive to irrelevant facts such as the source line, meaning
        a whitespace line added at the top of a source file will cause the hash
        to change.
+
+       When the source is not available, the name, the code object and the
+       default argument values of the function are used instead.
     """
-    logger.debug("serialising id_for_memo_function for function {}, type {}".format(function, type(function)))
+    memo_id = _function_memo_ids.get(function)
+    if memo_id is not None:
+        return memo_id
+
+    logger.debug("serialising id_for_memo_function for function %s, type %s", function, type(function))
     try:
         fn_source = getsource(function)
     except Exception as e:
         logger.warning("Unable to get source code for app caching. Recommend creating module. Exception was: {}".format(e))
-        fn_source = function.__name__
-    return serialize(fn_source.encode('utf-8'))
+        # Note that unlike source based ids, this depends on the bytecode
+        # and so on the Python version. Default argument values are not part
+        # of the code object, so are added separately; repr is used rather
+        # than id_for_memo so that defaults of unmemoizable types still work.
+        h = hashlib.blake2b(digest_size=32)
+        _update_with_memo_id(h, _code_digest(function.__code__))
+        _update_with_memo_id(h, repr(function.__defaults__).encode('utf-8'))
+        _update_with_memo_id(h, repr(sorted((function.__kwdefaults__ or {}).items())).encode('utf-8'))
+        memo_id = b'C' + function.__name__.encode('utf-8') + b'\0' + h.digest()
+    else:
+        memo_id = b'F' + fn_source.encode('utf-8')
+    _function_memo_ids[function] = memo_id
+    return memo_id
 
 
 class Memoizer(object):
@@ -147,7 +295,7 @@ class Memoizer(object):
     have resolved, we add its hash to the task datastructure.
     """
 
-    def __init__(self, dfk, memoize=True, checkpoint={}):
+    def __init__(self, dfk, memoize=True, checkpoint=None):
         """Initialize the memoizer.
 
         Args:
@@ -155,18 +303,47 @@ class Memoizer(object):
 
         KWargs:
             - memoize (Bool): enable memoization or not.
-            - checkpoint (Dict): A checkpoint loaded as a dict.
+            - checkpoint (Dict): A checkpoint loaded as a dict. Default=None
         """
         self.dfk = dfk
         self.memoize = memoize
 
         if self.memoize:
             logger.info("App caching initialized")
-            self.memo_lookup_table = checkpoint
+            self.memo_lookup_table = checkpoint if checkpoint is not None else {}
         else:
             logger.info("App caching disabled for all apps")
             self.memo_lookup_table = {}
 
+        # function -> hash object which has already been fed the memo id of
+        # that function. See _func_hasher.
+        self._func_hashers = weakref.WeakKeyDictionary()  # type: weakref.WeakKeyDictionary[object, object]
+
+    def _func_hasher(self, func):
+        """Return a hash object which has already been fed the memo id of func.
+
+        The function is the one part of the hash input which is the same for
+        every invocation of an app, and its memo id (based on the function
+        source) is often larger than the arguments. Callers must .copy() the
+        returned object before adding task specific input to it, so that the
+        function memo id is only hashed once per function rather than once
+        per task.
+        """
+        try:
+            hasher = self._func_hashers.get(func)
+        except TypeError:
+            # func cannot be weakly referenced (or hashed), so cannot be
+            # cached: hash it afresh every time
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(_id_for_memo_fast(func))
+            return hasher
+
+        if hasher is None:
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(_id_for_memo_fast(func))
+            self._func_hashers[func] = hasher
+        return hasher
+
     def make_hash(self, task):
         """Create a hash of the task inputs.
 
@@ -174,11 +351,9 @@ class Memoizer(object):
             - task (dict) : Task dictionary from dfk.tasks
 
         Returns:
-            - hash (str) : A unique hash string
+            - hash (bytes) : A unique hash digest
         """
-        # Function name TODO: Add fn body later
-
-        t = []
+        hashedsum = self._func_hasher(task['func']).copy()
 
         # if kwargs contains an outputs parameter, that parameter is removed
         # and normalised differently - with output_ref set to True.
@@ -188,23 +363,24 @@ class Memoizer(object):
 
         ignore_list = task['ignore_for_cache']
 
-        logger.debug("Ignoring these kwargs for checkpointing: {}".format(ignore_list))
+        # make_hash is called for every memoized task, so log messages here
+        # use lazy %-formatting rather than formatting the message up front
+        # even when debug logging is disabled.
+        logger.debug("Ignoring these kwargs for checkpointing: %s", ignore_list)
         for k in ignore_list:
-            logger.debug("Ignoring kwarg {}".format(k))
             del filtered_kw[k]
 
         if 'outputs' in task['kwargs']:
             outputs = task['kwargs']['outputs']
             del filtered_kw['outputs']
-            t = t + [id_for_memo(outputs, output_ref=True)]   # TODO: use append?
+            hashedsum.update(_id_for_memo_fast(outputs, output_ref=True))
 
-        t = t + [id_for_memo(filtered_kw)]
-        t = t + [id_for_memo(task['func']),
-                 id_for_memo(task['args'])]
+        # each component is fed to the hash as soon as it is computed, rather
+        # than being joined into one large intermediate buffer first.
+        hashedsum.update(_id_for_memo_fast(filtered_kw))
+        hashedsum.update(_id_for_memo_fast(task['args']))
 
-        x = b''.join(t)
-        hashedsum = hashlib.md5(x).hexdigest()
-        return hashedsum
+        return hashedsum.digest()
 
     def check_memo(self, task):
         """Create a hash of the task and its inputs and check the lookup table for this hash.
@@ -219,18 +395,26 @@ class Memoizer(object):
         Returns:
             - Result (Future): A completed future containing the memoized result
 
-        This call will also set task['hashsum'] to the unique hashsum for the func+inputs.
+        This call will also set task['hashsum'] to the unique hashsum for the func+inputs,
+        if it has not already been set by an earlier call for the same task.
         """
 
         task_id = task['id']
 
         if not self.memoize or not task['memoize']:
             task['hashsum'] = None
-            logger.debug("Task {} will not be memoized".format(task_id))
+            logger.debug("Task %s will not be memoized", task_id)
             return None
 
-        hashsum = self.make_hash(task)
-        logger.debug("Task {} has memoization hash {}".format(task_id, hashsum))
+        # A task which is being retried has already had its hash computed
+        # on an earlier launch attempt. Its arguments have been fully
+        # resolved by then, so the hash cannot change and can be reused
+        # rather than serialising all the inputs again.
+        hashsum = task['hashsum']
+        if hashsum is None:
+            hashsum = self.make_hash(task)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Task %s has memoization hash %s", task_id, hashsum.hex())
         result = None
         if hashsum in self.memo_lookup_table:
             result = self.memo_lookup_table[hashsum]
@@ -247,7 +431,7 @@ class Memoizer(object):
         """Lookup a hash in the memoization table.
 
         Args:
-            - hashsum (str): The same hashes used to uniquely identify apps+inputs
+            - hashsum (bytes): The same hashes used to uniquely identify apps+inputs
 
         Returns:
             - Lookup result
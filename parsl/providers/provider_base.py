@@ -29,6 +29,10 @@ class JobStatus(object):
     """Encapsulates a job state together with other details, presently a (error) message"""
     SUMMARY_TRUNCATION_THRESHOLD = 2048
 
+    # a JobStatus is created per job on every status poll, so avoid a per
+    # instance __dict__
+    __slots__ = ('state', 'message', 'exit_code', 'stdout_path', 'stderr_path')
+
     def __init__(self, state: JobState, message: str = None, exit_code: Optional[int] = None,
                  stdout_path: str = None, stderr_path: str = None):
         self.state = state
@@ -79,18 +83,23 @@ class JobStatus(object):
             # can happen for synthetic job failures
             return None
         try:
-            with open(path, 'r') as f:
-                f.seek(0, os.SEEK_END)
-                size = f.tell()
-                f.seek(0, os.SEEK_SET)
+            # The head and tail of the file are fetched with positioned reads
+            # on a raw file descriptor: this avoids seeking and the allocation
+            # of a buffered file object, and only the parts which end up in
+            # the summary are decoded.
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                size = os.fstat(fd).st_size
                 if size > JobStatus.SUMMARY_TRUNCATION_THRESHOLD:
-                    head = f.read(JobStatus.SUMMARY_TRUNCATION_THRESHOLD / 2)
-                    f.seek(size - JobStatus.SUMMARY_TRUNCATION_THRESHOLD / 2, os.SEEK_SET)
-                    tail = f.read(JobStatus.SUMMARY_TRUNCATION_THRESHOLD / 2)
-                    return head + '\n...\n' + tail
+                    half = JobStatus.SUMMARY_TRUNCATION_THRESHOLD // 2
+                    head = os.pread(fd, half, 0)
+                    tail = os.pread(fd, half, size - half)
+                    summary = head + b'\n...\n' + tail
                 else:
-                    f.seek(0, os.SEEK_SET)
-                    return f.read()
+                    summary = os.pread(fd, size, 0)
+            finally:
+                os.close(fd)
+            return summary.decode('utf-8', errors='replace')
         except FileNotFoundError:
             # When output is redirected to a file, but the process does not produce any output
             # bytes, no file is actually created. This handles that case.
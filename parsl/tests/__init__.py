@@ -4,4 +4,4 @@ from parsl.data_provider.files import File
 
 @id_for_memo.register(File)
 def id_for_memo_file(file: File, output_ref: bool = False):
-    return file.url
+    return file.url.encode('utf-8')
@@ -0,0 +1,39 @@
+from parsl.app.app import bash_app
+
+
+def make_echo_1():
+    @bash_app(cache=True)
+    def echo_app():
+        return "echo 1"
+    return echo_app
+
+
+def make_echo_2():
+    @bash_app(cache=True)
+    def echo_app():
+        return "echo 2"
+    return echo_app
+
+
+def test_memo_same_name_different_body():
+    """Testing that bash apps with the same name but different bodies are
+    not memoized as the same app
+    """
+    f1 = make_echo_1()()
+    f1.result()
+    f2 = make_echo_2()()
+    f2.result()
+
+    assert not f2.task_def['from_memo'], "A different app was memoized as the same app"
+    assert f1.task_def['hashsum'] != f2.task_def['hashsum']
+
+
+def test_memo_same_app():
+    """Testing that a bash app is still memoized when invoked twice
+    """
+    app = make_echo_1()
+    app().result()
+    f = app()
+    f.result()
+
+    assert f.task_def['from_memo'], "Memoized results were not used"
@@ -0,0 +1,26 @@
+from parsl.providers.provider_base import JobState, JobStatus
+
+
+def test_summary_short_file(tmp_path):
+    path = tmp_path / 'job.out'
+    path.write_text('hello\n')
+
+    status = JobStatus(JobState.COMPLETED, stdout_path=str(path))
+    assert status.stdout_summary == 'hello\n'
+
+
+def test_summary_truncated(tmp_path):
+    half = JobStatus.SUMMARY_TRUNCATION_THRESHOLD // 2
+    path = tmp_path / 'job.err'
+    path.write_text('a' * half + 'b' * 10000 + 'c' * half)
+
+    status = JobStatus(JobState.FAILED, stderr_path=str(path))
+    assert status.stderr_summary == 'a' * half + '\n...\n' + 'c' * half
+
+
+def test_summary_missing_file(tmp_path):
+    status = JobStatus(JobState.FAILED, stdout_path=str(tmp_path / 'missing'))
+    assert status.stdout_summary is None
+
+    status = JobStatus(JobState.FAILED)
+    assert status.stdout_summary is None
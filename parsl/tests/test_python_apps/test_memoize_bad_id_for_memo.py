@@ -23,6 +23,17 @@ def failing_memoizer(v, output_ref=False):
     raise FailingMemoizerTestError("Deliberate memoizer failure")
 
 
+# this class should have a memoizer that returns a str rather
+# than bytes
+class StrMemoizable:
+    pass
+
+
+@id_for_memo.register(StrMemoizable)
+def str_memoizer(v, output_ref=False):
+    return "not bytes"
+
+
 @python_app(cache=True)
 def noop_app(x, inputs=[], cache=True):
     return None
@@ -50,6 +61,14 @@ def test_python_failing_memoizer():
         fut.result()
 
 
+def test_python_str_memoizer():
+    """Testing behaviour when id_for_memo returns a str rather than bytes
+    """
+    fut = noop_app([StrMemoizable()])
+    with pytest.raises(ValueError, match="StrMemoizable"):
+        fut.result()
+
+
 def test_python_unmemoizable_after_dep():
     sleep_fut = sleep(1)
     fut = noop_app(Unmemoizable(), inputs=[sleep_fut])
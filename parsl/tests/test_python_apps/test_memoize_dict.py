@@ -0,0 +1,27 @@
+from parsl.app.app import python_app
+
+
+@python_app(cache=True)
+def random_uuid(x, cache=True):
+    import uuid
+    return str(uuid.uuid4())
+
+
+def test_python_memoization_dict_order():
+    """Testing that dict arguments are memoized regardless of insertion order
+    """
+    x = random_uuid({"a": 1, "b": 2}).result()
+    y = random_uuid({"b": 2, "a": 1}).result()
+    assert x == y, "Memoized results were not used"
+
+    z = random_uuid({"a": 2, "b": 1}).result()
+    assert x != z, "Different dicts were memoized as the same value"
+
+
+def test_python_memoization_dict_mixed_keys():
+    """Testing memoization of dict arguments with keys that cannot be
+    compared with each other
+    """
+    x = random_uuid({1: "a", "b": 2}).result()
+    y = random_uuid({"b": 2, 1: "a"}).result()
+    assert x == y, "Memoized results were not used"
@@ -0,0 +1,29 @@
+from parsl.dataflow.memoization import id_for_memo
+
+
+def make_function(body, params="x"):
+    """Returns a function for which inspect.getsource will fail, as it was
+    not defined in a source file.
+    """
+    namespace = {}
+    exec("def f(" + params + "):\n    return " + body, namespace)
+    return namespace['f']
+
+
+def test_id_for_memo_function_without_source():
+    """Testing that functions without source code are identified by their
+    code, not only by their name
+    """
+    assert id_for_memo(make_function("x + 1")) == id_for_memo(make_function("x + 1"))
+    assert id_for_memo(make_function("x + 1")) != id_for_memo(make_function("x + 2"))
+    assert id_for_memo(make_function("len(x)")) != id_for_memo(make_function("sum(x)"))
+    assert id_for_memo(make_function("[y + 1 for y in x]")) != id_for_memo(make_function("[y + 2 for y in x]"))
+
+
+def test_id_for_memo_function_without_source_defaults():
+    """Testing that functions without source code are identified by their
+    default argument values, which are not part of their code object
+    """
+    assert id_for_memo(make_function("x + y", "x, y=1")) == id_for_memo(make_function("x + y", "x, y=1"))
+    assert id_for_memo(make_function("x + y", "x, y=1")) != id_for_memo(make_function("x + y", "x, y=2"))
+    assert id_for_memo(make_function("x + y", "x, *, y=1")) != id_for_memo(make_function("x + y", "x, *, y=2"))
@@ -0,0 +1,32 @@
+from parsl.app.app import python_app
+from parsl.dataflow.memoization import id_for_memo
+
+
+class MyInt(int):
+    pass
+
+
+@python_app(cache=True)
+def random_uuid(x, cache=True):
+    import uuid
+    return str(uuid.uuid4())
+
+
+def test_python_memoization_distinguishes_scalars():
+    """Testing that scalars which compare equal, but have different types,
+    are not memoized as the same value
+    """
+    values = [1, True, 1.0, "1", None, 0, False, 0.0, "", -1, 2**70]
+
+    first = [random_uuid(v).result() for v in values]
+    again = [random_uuid(v).result() for v in values]
+
+    assert first == again, "Memoized results were not used"
+    assert len(set(first)) == len(values), "Distinct scalars were memoized as the same value"
+
+
+def test_id_for_memo_scalar_subclass():
+    """Testing that subclasses of scalar types are not given the same
+    memo id as the plain value
+    """
+    assert id_for_memo(MyInt(3)) != id_for_memo(3)
@@ -0,0 +1,33 @@
+from parsl.dataflow.memoization import Memoizer, id_for_memo
+
+
+# instances of this class cannot be weakly referenced, so the memoizer
+# cannot cache their hash prefix
+class SlottedCallable:
+    __slots__ = ('n',)
+
+    def __init__(self, n):
+        self.n = n
+
+    def __call__(self):
+        return self.n
+
+
+@id_for_memo.register(SlottedCallable)
+def id_for_memo_slotted_callable(c, output_ref=False):
+    return b'S' + id_for_memo(c.n)
+
+
+def make_task(func):
+    return {'func': func, 'args': (), 'kwargs': {}, 'ignore_for_cache': []}
+
+
+def test_make_hash_unweakrefable_func():
+    """Testing that a task function which cannot be weakly referenced is
+    still hashed
+    """
+    memoizer = Memoizer(None)
+
+    h1 = memoizer.make_hash(make_task(SlottedCallable(1)))
+    assert h1 == memoizer.make_hash(make_task(SlottedCallable(1)))
+    assert h1 != memoizer.make_hash(make_task(SlottedCallable(2)))